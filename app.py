@@ -1,280 +1,135 @@
-import sqlite3
 import pandas as pd
+import os
+import time
 import dash
-from dash import dcc, html, Input, Output
+from dash import dcc, html, Input, Output, ctx, DiskcacheManager
 import dash_leaflet as dl
 import plotly.express as px
 import plotly.graph_objects as go
 import dash_bootstrap_components as dbc
 from datetime import datetime
+from urllib.parse import parse_qs, urlencode
 
-########################################
-# DATABASE CONNECTION AND QUERIES
-########################################
+import diskcache
+from flask import jsonify
+from flask_compress import Compress
 
-db_path = "FinalProject.db"
-conn = sqlite3.connect(db_path)
-
-query_totals = """
-SELECT 
-    COUNT(*) AS TotalIncidents, 
-    SUM(VictimKilled) AS TotalVictimsKilled, 
-    SUM(VictimInjured) AS TotalVictimsInjured
-FROM Victims;
-"""
-totals = conn.execute(query_totals).fetchone()
-totals_dict = {
-    "Total Incidents": totals[0],
-    "Total Victims Killed": totals[1],
-    "Total Victims Injured": totals[2]
-}
-
-query_death_ratio = """
-SELECT 
-    Locations.StateName AS Location,
-    Victims.VictimKilled AS Victims_Killed,
-    Victims.VictimInjured AS Victims_Injured,
-    Incidents.IncidentDate
-FROM 
-    Incidents
-NATURAL JOIN 
-    Locations
-NATURAL JOIN 
-    Victims;
-"""
-victim_data = pd.read_sql_query(query_death_ratio, conn)
-
-query_incident_count = """
-SELECT 
-    Locations.StateName AS State,
-    Incidents.IncidentDate,
-    COUNT(Incidents.IncidentID) AS IncidentCount
-FROM 
-    Incidents
-JOIN 
-    Locations
-ON 
-    Incidents.LocationID = Locations.LocationID
-GROUP BY 
-    Locations.StateName, Incidents.IncidentDate
-"""
-incident_data = pd.read_sql_query(query_incident_count, conn)
-
-query_gun_violence = """
-SELECT 
-    Locations.StateName AS Location,
-    Victims.VictimKilled AS Victims_Killed,
-    Victims.VictimInjured AS Victims_Injured
-FROM Incidents 
-NATURAL JOIN Locations 
-NATURAL JOIN Victims;
-"""
-gun_violence_data = pd.read_sql_query(query_gun_violence, conn)
-conn.close()
+import datasets
+import fast_json
+from datasets import DatasetRegistry
+from result_cache import DEFAULT_CACHE_DIR, ResultCache, private_directory
 
 ########################################
-# DATA PROCESSING (First Snippet)
+# DATASET REGISTRY
 ########################################
 
-victim_data['IncidentDate'] = pd.to_datetime(victim_data['IncidentDate'])
-victim_data['IncidentMonth'] = victim_data['IncidentDate'].dt.strftime('%m')
-victim_data['Total_Victims'] = victim_data['Victims_Killed'] + victim_data['Victims_Injured']
-
-grouped_victim = victim_data.groupby(['Location', 'IncidentMonth']).agg({
-    'Total_Victims': 'sum',
-    'Victims_Killed': 'sum'
-}).reset_index()
+# Every dataset configured in DASHBOARD_DATASETS is served by this process.
+# Aggregates are loaded on first access and evicted least-recently-used once
+# DASHBOARD_MEMORY_BUDGET_MB is exceeded.
+registry = DatasetRegistry.from_env()
 
-grouped_victim['Death_Ratio'] = grouped_victim.apply(
-    lambda row: round((row['Victims_Killed'] / row['Total_Victims']) * 100, 2) if row['Total_Victims'] > 0 else 0,
-    axis=1
-)
+# Callback results are shared by all workers through ResultCache (see
+# DASHBOARD_CACHE_* in result_cache.py) and keyed by the dataset file version
+# and the source of the callbacks and of datasets.py.
+cache = ResultCache.from_env(source_modules=[datasets])
 
-all_months_victim = grouped_victim.groupby('Location').agg({
-    'Total_Victims': 'sum',
-    'Victims_Killed': 'sum'
-}).reset_index()
-all_months_victim['Death_Ratio'] = all_months_victim.apply(
-    lambda row: round((row['Victims_Killed'] / row['Total_Victims']) * 100, 2) if row['Total_Victims'] > 0 else 0,
-    axis=1
-)
-all_months_victim['IncidentMonth'] = 'All'
-
-complete_victim_data = pd.concat([grouped_victim, all_months_victim], ignore_index=True)
-
-incident_data['IncidentDate'] = pd.to_datetime(incident_data['IncidentDate'])
-incident_data['IncidentMonth'] = incident_data['IncidentDate'].dt.strftime('%m')
-incident_grouped = incident_data.groupby(['State', 'IncidentMonth'], as_index=False)['IncidentCount'].sum()
-
-all_months_incident = incident_data.groupby('State', as_index=False)['IncidentCount'].sum()
-all_months_incident['IncidentMonth'] = 'All'
-complete_incident_data = pd.concat([incident_grouped, all_months_incident], ignore_index=True)
-
-state_full_name_map = {
-    'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR',
-    'California': 'CA', 'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE',
-    'Florida': 'FL', 'Georgia': 'GA', 'Hawaii': 'HI', 'Idaho': 'ID',
-    'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA', 'Kansas': 'KS',
-    'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD',
-    'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN',
-    'Mississippi': 'MS', 'Missouri': 'MO', 'Montana': 'MT', 'Nebraska': 'NE',
-    'Nevada': 'NV', 'New Hampshire': 'NH', 'New Jersey': 'NJ',
-    'New Mexico': 'NM', 'New York': 'NY', 'North Carolina': 'NC',
-    'North Dakota': 'ND', 'Ohio': 'OH', 'Oklahoma': 'OK', 'Oregon': 'OR',
-    'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC',
-    'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT',
-    'Vermont': 'VT', 'Virginia': 'VA', 'Washington': 'WA',
-    'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY'
-}
-
-complete_victim_data['Abbreviation'] = complete_victim_data['Location'].map(state_full_name_map)
-complete_incident_data['Abbreviation'] = complete_incident_data['State'].map(state_full_name_map)
-
-merged_data = pd.merge(
-    complete_victim_data[['Abbreviation', 'IncidentMonth', 'Death_Ratio']],
-    complete_incident_data[['Abbreviation', 'IncidentMonth', 'IncidentCount']],
-    on=['Abbreviation', 'IncidentMonth'],
-    how='outer'
-)
-
-merged_data = merged_data.dropna(subset=['IncidentCount', 'Death_Ratio'], how='all')
-state_names = pd.DataFrame(list(state_full_name_map.items()), columns=['FullName', 'Abbreviation'])
-combined_data = pd.merge(merged_data, state_names, on='Abbreviation', how='left')
-
-gun_violence_data['Incident_Count'] = 1
-gun_violence_data['Total_Victims'] = gun_violence_data['Victims_Killed'] + gun_violence_data['Victims_Injured']
-location_data = gun_violence_data.groupby('Location').agg({
-    'Incident_Count': 'sum',
-    'Total_Victims': 'sum',
-    'Victims_Killed': 'sum',
-    'Victims_Injured': 'sum'
-}).reset_index()
-
-location_data['Death_Ratio'] = location_data.apply(
-    lambda row: round(row['Victims_Killed'] / row['Total_Victims'], 2) 
-    if row['Total_Victims'] > 0 else 0,
-    axis=1
-)
+def dataset_version(*args):
+    # Every cached callback takes the dataset key as its last argument.
+    return registry.version(args[-1])
 
 ########################################
-# SECOND CODE SNIPPET DATA FETCH & PROCESSING
+# DASH APP SETUP
 ########################################
 
-conn2 = sqlite3.connect('FinalProject.db')
-query_map = """
-SELECT 
-    Locations.StateName AS StateName_2,
-    Locations.City_CountyName AS City_CountyName_2,
-    Locations.Latitude AS Latitude_2,
-    Locations.Longitude AS Longitude_2,
-    GROUP_CONCAT(DISTINCT Incidents.IncidentID) AS IncidentIDs_2,
-    COUNT(Incidents.IncidentID) AS TotalIncidents_2,
-    SUM(Victims.VictimKilled) AS TotalKilled_2,
-    SUM(Victims.VictimInjured) AS TotalInjured_2,
-    Incidents.IncidentDate AS IncidentDate_2
-FROM 
-    Incidents
-JOIN 
-    Locations
-ON 
-    Incidents.LocationID = Locations.LocationID
-JOIN 
-    Victims
-ON 
-    Incidents.VictimID = Victims.VictimID
-GROUP BY 
-    Locations.Latitude, Locations.Longitude, Locations.StateName, Locations.City_CountyName, Incidents.IncidentDate
-"""
-incidents_data_2 = pd.read_sql_query(query_map, conn2)
-
-query2_2 = """
-SELECT 
-    IncidentDate AS Date_2,
-    VictimKilled AS Victims_Killed_2,
-    VictimInjured AS Victims_Injured_2
-FROM Incidents NATURAL JOIN Victims;
-"""
-data_2 = pd.read_sql_query(query2_2, conn2)
-
-incidents_query_2 = "SELECT IncidentDate AS IncidentDate_3 FROM incidents"
-df_incidents_2 = pd.read_sql_query(incidents_query_2, conn2)
-
-death_ratio_query_2 = """
-SELECT 
-    Victims.VictimKilled AS Victims_Killed_3,
-    Victims.VictimInjured AS Victims_Injured_3,
-    Incidents.IncidentDate AS IncidentDate_4
-FROM 
-    Incidents
-NATURAL JOIN 
-    Victims
-"""
-df_victims_2 = pd.read_sql_query(death_ratio_query_2, conn2)
-conn2.close()
-
-incidents_data_2['TotalVictims_2'] = incidents_data_2['TotalKilled_2'] + incidents_data_2['TotalInjured_2']
-incidents_data_2['IncidentDate_2'] = pd.to_datetime(incidents_data_2['IncidentDate_2'])
-min_date_2 = incidents_data_2['IncidentDate_2'].min()
-max_date_2 = incidents_data_2['IncidentDate_2'].max()
-
-data_2['Date_2'] = pd.to_datetime(data_2['Date_2'], format='%B %d, %Y', errors='coerce')
-data_2 = data_2.dropna(subset=['Date_2'])
-data_2['Incident_Count_2'] = 1
-data_2['Month_2'] = data_2['Date_2'].dt.month
-
-monthly_data_2 = data_2.groupby('Month_2').agg({
-    'Incident_Count_2': 'sum',
-    'Victims_Killed_2': 'sum',
-    'Victims_Injured_2': 'sum'
-}).reset_index()
-
-monthly_data_2['Victim_Killed_Ratio_2'] = monthly_data_2.apply(
-    lambda row: round((row['Victims_Killed_2'] / (row['Victims_Killed_2'] + row['Victims_Injured_2'])) * 100, 2) 
-    if (row['Victims_Killed_2'] + row['Victims_Injured_2']) > 0 else 0,
-    axis=1
+# Long-running callbacks are declared with background=True and run as jobs
+# outside the request thread. Job state lives on local disk so every worker
+# on the host can poll any job; diskcache pickles it, so like the result
+# cache it stays out of the shared temp directory.
+background_callback_manager = DiskcacheManager(
+    diskcache.Cache(private_directory(os.environ.get(
+        'DASHBOARD_JOBS_PATH',
+        os.path.join(DEFAULT_CACHE_DIR, 'jobs')
+    )))
 )
 
-df_incidents_2['IncidentDate_3'] = pd.to_datetime(df_incidents_2['IncidentDate_3'])
-df_victims_2['IncidentDate_4'] = pd.to_datetime(df_victims_2['IncidentDate_4'])
-
-daily_incident_data_2 = df_incidents_2.groupby(df_incidents_2['IncidentDate_3'].dt.day_name()).size().reset_index()
-daily_incident_data_2.columns = ['day_2', 'incidents_2']
-
-day_order_2 = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-daily_incident_data_2['day_2'] = pd.Categorical(daily_incident_data_2['day_2'], categories=day_order_2, ordered=True)
-daily_incident_data_2 = daily_incident_data_2.sort_values('day_2')
-
-df_victims_2['Total_Victims_3'] = df_victims_2['Victims_Killed_3'] + df_victims_2['Victims_Injured_3']
-df_victims_2['day_2'] = df_victims_2['IncidentDate_4'].dt.day_name()
-daily_victim_data_2 = df_victims_2.groupby('day_2').agg({'Victims_Killed_3': 'sum', 'Total_Victims_3': 'sum'}).reset_index()
-daily_victim_data_2['Death_Ratio_2'] = daily_victim_data_2.apply(
-    lambda row: round((row['Victims_Killed_3'] / row['Total_Victims_3']) * 100, 2) 
-    if row['Total_Victims_3'] > 0 else 0,
-    axis=1
+app = dash.Dash(
+    __name__,
+    external_stylesheets=[dbc.themes.FLATLY],
+    background_callback_manager=background_callback_manager
 )
-daily_victim_data_2['day_2'] = pd.Categorical(daily_victim_data_2['day_2'], categories=day_order_2, ordered=True)
-daily_victim_data_2 = daily_victim_data_2.sort_values('day_2')
+server = app.server
 
-combined_daily_data_2 = pd.merge(daily_incident_data_2, daily_victim_data_2, on='day_2', how='outer')
+# Serialize callback responses with orjson (see fast_json.py).
+fast_json.install()
 
-########################################
-# DASH APP SETUP
-########################################
+# Responses larger than DASHBOARD_COMPRESS_MIN_BYTES are compressed with
+# brotli or gzip, whichever the browser accepts (brotli preferred).
+server.config.update(
+    COMPRESS_ALGORITHM=['br', 'gzip'],
+    COMPRESS_MIMETYPES=['application/json', 'text/html', 'text/css', 'application/javascript'],
+    COMPRESS_MIN_SIZE=int(os.environ.get('DASHBOARD_COMPRESS_MIN_BYTES', 1024)),
+    COMPRESS_BR_LEVEL=4
+)
+Compress(server)
 
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.FLATLY])
-server = app.server
+@server.route('/_cache-stats')
+def cache_stats():
+    return jsonify(cache.stats())
 
 ########################################
 # APP LAYOUT
 ########################################
 
+# Dropdown options are shared with export_static.py, which pre-renders every
+# combination of them.
+month_options = [
+    {'label': 'All Months', 'value': 'All'},
+    {'label': 'January', 'value': '01'},
+    {'label': 'February', 'value': '02'},
+    {'label': 'March', 'value': '03'},
+    {'label': 'April', 'value': '04'},
+    {'label': 'May', 'value': '05'},
+    {'label': 'June', 'value': '06'},
+    {'label': 'July', 'value': '07'},
+    {'label': 'August', 'value': '08'},
+    {'label': 'September', 'value': '09'},
+    {'label': 'October', 'value': '10'},
+    {'label': 'November', 'value': '11'},
+    {'label': 'December', 'value': '12'}
+]
+map_metric_options = [
+    {'label': 'Incident Counts', 'value': 'IncidentCount'},
+    {'label': 'Death Ratio (%)', 'value': 'Death_Ratio'}
+]
+bar_metric_options = [
+    {'label': 'Incident Counts', 'value': 'Incident_Count'},
+    {'label': 'Death Ratio (%)', 'value': 'Death_Ratio'}
+]
+monthly_metric_options_2 = [
+    {'label': 'Incidents Counts', 'value': 'Incident_Count_2'},
+    {'label': 'Total Victims', 'value': 'Victims_Over_Months_2'},
+    {'label': 'Death Ratio (%)', 'value': 'Victim_Killed_Ratio_Over_Months_2'}
+]
+day_of_week_metric_options_2 = [
+    {'label': 'Incident Counts', 'value': 'incidents_2'},
+    {'label': 'Death Ratio (%)', 'value': 'Death_Ratio_2'}
+]
+
 navbar = dbc.Navbar(
     dbc.Container([
         dbc.NavbarBrand(
-            "U.S. Gun Violence 2024 Dashboard",
+            registry.title(registry.default_key),
+            id='dashboard-title',
             className="mx-auto",  
             style={"fontWeight": "bold", "fontSize": "24px", "color": "#FFFFFF", "textAlign": "center"}
         ),
+        dcc.Dropdown(
+            id='dataset-picker',
+            options=[{'label': key, 'value': key} for key in registry.keys()],
+            value=registry.default_key,
+            clearable=False,
+            style={'width': '200px'}
+        ),
     ]),
     color="black",  
     dark=True,
@@ -301,7 +156,7 @@ top_metrics_row = dbc.Row(
                     [
                         html.H4("Total Incidents", className="card-title text-center", style={"color": "#2C3E50"}),
                         html.H5(
-                            f"{totals_dict['Total Incidents']:,}",
+                            id='kpi-total-incidents',
                             className="card-text text-center",
                             style={"fontSize": "30px", "color": "#E74C3C"}
                         ),
@@ -318,7 +173,7 @@ top_metrics_row = dbc.Row(
                     [
                         html.H4("Victims Killed", className="card-title text-center", style={"color": "#2C3E50"}),
                         html.H5(
-                            f"{totals_dict['Total Victims Killed']:,}",
+                            id='kpi-victims-killed',
                             className="card-text text-center",
                             style={"fontSize": "30px", "color": "#E74C3C"}
                         ),
@@ -335,7 +190,7 @@ top_metrics_row = dbc.Row(
                     [
                         html.H4("Victims Injured", className="card-title text-center", style={"color": "#2C3E50"}),
                         html.H5(
-                            f"{totals_dict['Total Victims Injured']:,}",
+                            id='kpi-victims-injured',
                             className="card-text text-center",
                             style={"fontSize": "30px", "color": "#E74C3C"}
                         ),
@@ -351,6 +206,7 @@ top_metrics_row = dbc.Row(
 )
 
 app.layout = dbc.Container([
+    dcc.Location(id='url', refresh=False),
     navbar,
     top_metrics_row,  
     # Row 1: First snippet visualization
@@ -362,31 +218,14 @@ app.layout = dbc.Container([
                     html.Label("Select Metric:", style={'font-weight': 'bold'}),
                     dcc.Dropdown(
                         id='metric-filter',
-                        options=[
-                            {'label': 'Incident Counts', 'value': 'IncidentCount'},
-                            {'label': 'Death Ratio (%)', 'value': 'Death_Ratio'}
-                        ],
+                        options=map_metric_options,
                         value='IncidentCount',
                         className="mb-3"
                     ),
                     html.Label("Filter by Month:", style={'font-weight': 'bold'}),
                     dcc.Dropdown(
                         id='month-filter',
-                        options=[
-                            {'label': 'All Months', 'value': 'All'},
-                            {'label': 'January', 'value': '01'},
-                            {'label': 'February', 'value': '02'},
-                            {'label': 'March', 'value': '03'},
-                            {'label': 'April', 'value': '04'},
-                            {'label': 'May', 'value': '05'},
-                            {'label': 'June', 'value': '06'},
-                            {'label': 'July', 'value': '07'},
-                            {'label': 'August', 'value': '08'},
-                            {'label': 'September', 'value': '09'},
-                            {'label': 'October', 'value': '10'},
-                            {'label': 'November', 'value': '11'},
-                            {'label': 'December', 'value': '12'}
-                        ],
+                        options=month_options,
                         value='All',
                         className="mb-3"
                     ),
@@ -401,31 +240,14 @@ dbc.CardBody([
     html.Label("Select a Metric:", style={'font-weight': 'bold'}),
     dcc.Dropdown(
         id='metric-picker',
-        options=[
-            {'label': 'Incident Counts', 'value': 'Incident_Count'},
-            {'label': 'Death Ratio (%)', 'value': 'Death_Ratio'}
-        ],
+        options=bar_metric_options,
         value='Incident_Count',
         className="mb-3"
     ),
     html.Label("Filter by Month:", style={'font-weight': 'bold'}),
     dcc.Dropdown(
         id='month-filter-bar-chart',
-        options=[
-            {'label': 'All Months', 'value': 'All'},
-            {'label': 'January', 'value': '01'},
-            {'label': 'February', 'value': '02'},
-            {'label': 'March', 'value': '03'},
-            {'label': 'April', 'value': '04'},
-            {'label': 'May', 'value': '05'},
-            {'label': 'June', 'value': '06'},
-            {'label': 'July', 'value': '07'},
-            {'label': 'August', 'value': '08'},
-            {'label': 'September', 'value': '09'},
-            {'label': 'October', 'value': '10'},
-            {'label': 'November', 'value': '11'},
-            {'label': 'December', 'value': '12'}
-        ],
+        options=month_options,
         value='All',
         className="mb-3"
     ),
@@ -444,12 +266,14 @@ dbc.Card([
             html.Label("Filter by Date Range:", style={'font-weight': 'bold'}),
             dcc.DatePickerRange(
                 id='date-picker-range_2',
-                start_date=min_date_2,
-                end_date=max_date_2,
-                min_date_allowed=min_date_2,
-                max_date_allowed=max_date_2,
             ),
-            html.Br(),
+            dcc.Store(id='marker-request_2'),
+            dbc.Progress(
+                id='marker-progress_2',
+                value=0,
+                max=1,
+                style={'height': '4px', 'margin-top': '10px', 'visibility': 'hidden'}
+            ),
             dl.Map(
                 id='incident-map_2',
                 children=[
@@ -475,11 +299,7 @@ dbc.Card([
                     html.Label("Select a Metric:", style={'font-weight': 'bold'}),
                     dcc.Dropdown(
                         id='metric-picker_2',
-                        options=[
-                            {'label': 'Incidents Counts', 'value': 'Incident_Count_2'},
-                            {'label': 'Total Victims', 'value': 'Victims_Over_Months_2'},
-                            {'label': 'Death Ratio (%)', 'value': 'Victim_Killed_Ratio_Over_Months_2'}
-                        ],
+                        options=monthly_metric_options_2,
                         value='Incident_Count_2',
                         clearable=False,
                         style={'width': '90%', 'margin-top': '10px'}
@@ -496,10 +316,7 @@ dbc.Card([
                     html.Label("Select Metric:", style={'font-weight': 'bold'}),
                     dcc.Dropdown(
                         id='metric-dropdown_2',
-                        options=[
-                            {'label': 'Incident Counts', 'value': 'incidents_2'},
-                            {'label': 'Death Ratio (%)', 'value': 'Death_Ratio_2'}
-                        ],
+                        options=day_of_week_metric_options_2,
                         value='incidents_2',
                         placeholder="Select a Metric",
                         style={'width': '90%', 'margin-top': '10px'}
@@ -513,15 +330,77 @@ dbc.Card([
 ], fluid=True, style={'background': '#ECF0F1', 'min-height': '100vh'})
 
 
+########################################
+# CALLBACKS FOR DATASET SELECTION
+########################################
+def dataset_from_search(search):
+    values = parse_qs((search or '').lstrip('?')).get('dataset')
+    return registry.resolve(values[0] if values else None)
+
+@app.callback(
+    [Output('dataset-picker', 'value'),
+     Output('url', 'search')],
+    [Input('url', 'search'),
+     Input('dataset-picker', 'value')]
+)
+def sync_dataset_selection(search, selected_dataset):
+    # The URL and the dropdown both select the dataset; keep them in step.
+    if ctx.triggered_id == 'dataset-picker':
+        dataset_key = registry.resolve(selected_dataset)
+    else:
+        dataset_key = dataset_from_search(search)
+    return dataset_key, '?' + urlencode({'dataset': dataset_key})
+
+@app.callback(
+    [Output('dashboard-title', 'children'),
+     Output('date-picker-range_2', 'min_date_allowed'),
+     Output('date-picker-range_2', 'max_date_allowed'),
+     Output('date-picker-range_2', 'start_date'),
+     Output('date-picker-range_2', 'end_date')],
+    [Input('dataset-picker', 'value')]
+)
+def update_dataset_header(dataset_key):
+    dataset = registry.get(dataset_key)
+    min_date_2 = dataset['min_date_2'].date()
+    max_date_2 = dataset['max_date_2'].date()
+    return (
+        registry.title(dataset_key),
+        min_date_2,
+        max_date_2,
+        min_date_2,
+        max_date_2
+    )
+
+@app.callback(
+    [Output('kpi-total-incidents', 'children'),
+     Output('kpi-victims-killed', 'children'),
+     Output('kpi-victims-injured', 'children')],
+    [Input('date-picker-range_2', 'start_date'),
+     Input('date-picker-range_2', 'end_date'),
+     Input('dataset-picker', 'value')]
+)
+def update_kpis(start_date, end_date, dataset_key):
+    # Answered from the prefix-sum date index, so the cards follow the date
+    # picker without scanning incidents_data_2.
+    totals_dict = registry.get(dataset_key)['date_index_2'].totals(start_date, end_date)
+    return (
+        f"{totals_dict['Total Incidents']:,}",
+        f"{totals_dict['Total Victims Killed']:,}",
+        f"{totals_dict['Total Victims Injured']:,}"
+    )
+
 ########################################
 # CALLBACKS FOR FIRST SNIPPET
 ########################################
 @app.callback(
     Output('choropleth-map', 'figure'),
     [Input('metric-filter', 'value'),
-     Input('month-filter', 'value')]
+     Input('month-filter', 'value'),
+     Input('dataset-picker', 'value')]
 )
-def update_map(selected_metric, selected_month):
+@cache.memoize('update_map', version=dataset_version)
+def update_map(selected_metric, selected_month, dataset_key):
+    combined_data = registry.get(dataset_key)['combined_data']
     if selected_month == 'All':
         filtered_data = combined_data[combined_data['IncidentMonth'] == 'All']
         title_month = "All Months"
@@ -565,9 +444,14 @@ def update_map(selected_metric, selected_month):
 @app.callback(
     Output('top-locations-bar-chart', 'figure'),
     [Input('metric-picker', 'value'),
-     Input('month-filter-bar-chart', 'value')]
+     Input('month-filter-bar-chart', 'value'),
+     Input('dataset-picker', 'value')]
 )
-def update_chart(selected_metric, selected_month):
+@cache.memoize('update_chart', version=dataset_version)
+def update_chart(selected_metric, selected_month, dataset_key):
+    dataset = registry.get(dataset_key)
+    complete_incident_data = dataset['complete_incident_data']
+    complete_victim_data = dataset['complete_victim_data']
     if selected_month == 'All':
         filtered_data = complete_incident_data[complete_incident_data['IncidentMonth'] == 'All'] if selected_metric == 'Incident_Count' else complete_victim_data[complete_victim_data['IncidentMonth'] == 'All']
     else:
@@ -621,33 +505,85 @@ def update_chart(selected_metric, selected_month):
 ########################################
 # CALLBACKS FOR SECOND SNIPPET (With _2 suffix)
 ########################################
+# The marker layer is looked up in the result cache in the request thread and
+# only a miss starts a background job, so a hit renders without forking a
+# process or waiting for a poll. When the date range or dataset changes while
+# a job is still running, the job is cancelled instead of computed to
+# completion.
 @app.callback(
-    Output('marker-layer_2', 'children'),
+    [Output('marker-layer_2', 'children'),
+     Output('marker-request_2', 'data')],
     [Input('date-picker-range_2', 'start_date'),
-     Input('date-picker-range_2', 'end_date')]
+     Input('date-picker-range_2', 'end_date'),
+     Input('dataset-picker', 'value')]
 )
-def update_markers_2(start_date, end_date):
-    filtered_data_2 = incidents_data_2[
-        (incidents_data_2['IncidentDate_2'] >= pd.to_datetime(start_date)) &
-        (incidents_data_2['IncidentDate_2'] <= pd.to_datetime(end_date))
+def serve_markers_2(start_date, end_date, dataset_key):
+    markers = update_markers_2.lookup(start_date, end_date, dataset_key)
+    if markers is not None:
+        return markers, dash.no_update
+    # requested_at makes a repeated request for the same range (after a
+    # cancelled job) still trigger run_markers_job_2.
+    return dash.no_update, {
+        'start_date': start_date,
+        'end_date': end_date,
+        'dataset_key': dataset_key,
+        'requested_at': time.time()
+    }
+
+@app.callback(
+    Output('marker-layer_2', 'children', allow_duplicate=True),
+    [Input('marker-request_2', 'data')],
+    background=True,
+    interval=200,
+    prevent_initial_call=True,
+    progress=[Output('marker-progress_2', 'value'),
+              Output('marker-progress_2', 'max')],
+    running=[(Output('marker-progress_2', 'style'),
+              {'height': '4px', 'margin-top': '10px', 'visibility': 'visible'},
+              {'height': '4px', 'margin-top': '10px', 'visibility': 'hidden'})],
+    cancel=[Input('date-picker-range_2', 'start_date'),
+            Input('date-picker-range_2', 'end_date'),
+            Input('dataset-picker', 'value')]
+)
+def run_markers_job_2(set_progress, request):
+    return update_markers_2.compute(
+        set_progress, request['start_date'], request['end_date'], request['dataset_key']
+    )
+
+@cache.memoize('update_markers_2', version=dataset_version, progress=True)
+def update_markers_2(set_progress, start_date, end_date, dataset_key):
+    incidents_data_2 = registry.get(dataset_key)['incidents_data_2']
+    # incidents_data_2 is sorted by date, so the range is a contiguous slice.
+    dates_2 = incidents_data_2['IncidentDate_2'].values
+    filtered_data_2 = incidents_data_2.iloc[
+        dates_2.searchsorted(pd.to_datetime(start_date).to_datetime64(), side='left'):
+        dates_2.searchsorted(pd.to_datetime(end_date).to_datetime64(), side='right')
     ]
 
     max_victims_2 = filtered_data_2['TotalVictims_2'].max() if not filtered_data_2.empty else 1
 
+    max_incidents_2 = filtered_data_2['TotalIncidents_2'].max() if not filtered_data_2.empty else 1
+    total_rows_2 = len(filtered_data_2)
+    set_progress((0, max(total_rows_2, 1)))
+
     markers = []
-    for _, row in filtered_data_2.iterrows():
+    for i, (_, row) in enumerate(filtered_data_2.iterrows(), start=1):
+        if i % 50 == 0:
+            set_progress((i, total_rows_2))
         if row['TotalVictims_2'] > 0:
             death_ratio = (row['TotalKilled_2'] / row['TotalVictims_2']) * 100
         else:
             death_ratio = 0
+        # Rounded so every marker does not ship 16 significant digits twice.
+        marker_color_2 = f"rgba(255, 0, 0, {round(row['TotalVictims_2'] / max_victims_2, 3)})"
 
         markers.append(
             dl.CircleMarker(
                 center=[row['Latitude_2'], row['Longitude_2']],
-                radius=15 + (row['TotalIncidents_2'] / filtered_data_2['TotalIncidents_2'].max() * 10),
-                color=f"rgba(255, 0, 0, {row['TotalVictims_2'] / max_victims_2})",
+                radius=round(15 + (row['TotalIncidents_2'] / max_incidents_2 * 10), 2),
+                color=marker_color_2,
                 fill=True,
-                fillColor=f"rgba(255, 0, 0, {row['TotalVictims_2'] / max_victims_2})",
+                fillColor=marker_color_2,
                 fillOpacity=0.7,
                 children=[
                     dl.Popup(
@@ -669,9 +605,12 @@ def update_markers_2(start_date, end_date):
 
 @app.callback(
     Output('monthly-trends-line-chart_2', 'figure'),
-    [Input('metric-picker_2', 'value')]
+    [Input('metric-picker_2', 'value'),
+     Input('dataset-picker', 'value')]
 )
-def update_monthly_chart_2(selected_metric):
+@cache.memoize('update_monthly_chart_2', version=dataset_version)
+def update_monthly_chart_2(selected_metric, dataset_key):
+    monthly_data_2 = registry.get(dataset_key)['monthly_data_2']
     month_labels = ['January', 'February', 'March', 'April', 'May', 'June',
                     'July', 'August', 'September', 'October', 'November', 'December']
     if selected_metric == 'Incident_Count_2':
@@ -737,9 +676,12 @@ def update_monthly_chart_2(selected_metric):
 
 @app.callback(
     Output('bar-chart_2', 'figure'),
-    [Input('metric-dropdown_2', 'value')]
+    [Input('metric-dropdown_2', 'value'),
+     Input('dataset-picker', 'value')]
 )
-def update_day_of_week_chart_2(selected_metric):
+@cache.memoize('update_day_of_week_chart_2', version=dataset_version)
+def update_day_of_week_chart_2(selected_metric, dataset_key):
+    combined_daily_data_2 = registry.get(dataset_key)['combined_daily_data_2']
     if selected_metric == 'incidents_2':
         title = "Total Number of Incidents by Day of Week"
         y_data = combined_daily_data_2['incidents_2']
@@ -0,0 +1,85 @@
+import argparse
+import gzip
+import time
+
+import brotli
+from plotly.io.json import to_json_plotly
+
+import app
+import fast_json
+
+########################################
+# CALLBACK PAYLOAD BENCHMARK
+########################################
+
+# Measures, per callback, the response body Dash sends and the time it takes
+# to serialize it: before (plotly's stdlib json engine, uncompressed) and after
+# (fast_json, then gzip or brotli at the levels the server uses). Both columns
+# serialize the current callback output, so changes to what a callback
+# returns (such as the rounded marker colours) are not part of the comparison.
+#
+#     python benchmark_payloads.py --dataset 2024 --repeat 20
+
+def no_progress(progress):
+    pass
+
+
+# (callback id, function, arguments without the dataset key)
+CALLS = [
+    ('update_map', app.update_map, lambda dataset: ('IncidentCount', 'All')),
+    ('update_chart', app.update_chart, lambda dataset: ('Incident_Count', 'All')),
+    ('update_markers_2', app.update_markers_2,
+     lambda dataset: (no_progress, dataset['min_date_2'], dataset['max_date_2'])),
+    ('update_monthly_chart_2', app.update_monthly_chart_2, lambda dataset: ('Victims_Over_Months_2',)),
+    ('update_day_of_week_chart_2', app.update_day_of_week_chart_2, lambda dataset: ('incidents_2',)),
+]
+
+
+def best_time(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def measure(result, repeat):
+    json_time, json_body = best_time(lambda: to_json_plotly(result, engine='json').encode('utf-8'), repeat)
+    fast_time, fast_body = best_time(lambda: fast_json.dumps(result).encode('utf-8'), repeat)
+    gzip_time, gzip_body = best_time(
+        lambda: gzip.compress(fast_body, compresslevel=app.server.config['COMPRESS_LEVEL']), repeat
+    )
+    br_time, br_body = best_time(
+        lambda: brotli.compress(fast_body, quality=app.server.config['COMPRESS_BR_LEVEL']), repeat
+    )
+    return {
+        'json_bytes': len(json_body),
+        'json_ms': json_time * 1000,
+        'fast_ms': fast_time * 1000,
+        'gzip_bytes': len(gzip_body),
+        'gzip_ms': (fast_time + gzip_time) * 1000,
+        'br_bytes': len(br_body),
+        'br_ms': (fast_time + br_time) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure callback payload sizes and serialization times.")
+    parser.add_argument('--dataset', default=app.registry.default_key, help="dataset key (default: the first configured)")
+    parser.add_argument('--repeat', type=int, default=20, help="timing repetitions, the best is reported (default: 20)")
+    args = parser.parse_args()
+
+    dataset = app.registry.get(args.dataset)
+    print(f"{'callback':<28}{'json B':>10}{'json ms':>9}{'fast ms':>9}"
+          f"{'gzip B':>9}{'gzip ms':>9}{'br B':>9}{'br ms':>8}")
+    for callback_id, func, callback_args in CALLS:
+        # Bypass the result cache so the callback output is freshly built.
+        result = func.__wrapped__(*callback_args(dataset), args.dataset)
+        row = measure(result, args.repeat)
+        print(f"{callback_id:<28}{row['json_bytes']:>10,}{row['json_ms']:>9.2f}{row['fast_ms']:>9.2f}"
+              f"{row['gzip_bytes']:>9,}{row['gzip_ms']:>9.2f}{row['br_bytes']:>9,}{row['br_ms']:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
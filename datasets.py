@@ -0,0 +1,387 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+########################################
+# DATASET CONFIGURATION
+########################################
+
+# DASHBOARD_DATASETS is a comma separated list of key=path pairs, e.g.
+# "2024=FinalProject.db,2023=data/2023.db,2024-west=data/2024_west.db".
+# The key is used in the URL (?dataset=2024) and in the dashboard title.
+DEFAULT_DATASETS = "2024=FinalProject.db"
+DEFAULT_MEMORY_BUDGET_MB = 512
+
+state_full_name_map = {
+    'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR',
+    'California': 'CA', 'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE',
+    'Florida': 'FL', 'Georgia': 'GA', 'Hawaii': 'HI', 'Idaho': 'ID',
+    'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA', 'Kansas': 'KS',
+    'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD',
+    'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN',
+    'Mississippi': 'MS', 'Missouri': 'MO', 'Montana': 'MT', 'Nebraska': 'NE',
+    'Nevada': 'NV', 'New Hampshire': 'NH', 'New Jersey': 'NJ',
+    'New Mexico': 'NM', 'New York': 'NY', 'North Carolina': 'NC',
+    'North Dakota': 'ND', 'Ohio': 'OH', 'Oklahoma': 'OK', 'Oregon': 'OR',
+    'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC',
+    'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT',
+    'Vermont': 'VT', 'Virginia': 'VA', 'Washington': 'WA',
+    'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY'
+}
+
+day_order_2 = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def parse_dataset_config(value):
+    datasets = OrderedDict()
+    for entry in value.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        key, sep, path = entry.partition('=')
+        if not sep or not key.strip() or not path.strip():
+            raise ValueError(f"Invalid dataset entry {entry!r}, expected key=path")
+        datasets[key.strip()] = path.strip()
+    if not datasets:
+        raise ValueError("No datasets configured")
+    return datasets
+
+########################################
+# PREFIX-SUM DATE INDEX
+########################################
+
+class DateRangeIndex:
+    # Sorted per-day cumulative sums of incidents, victims killed and victims
+    # injured. Totals for any date range are two binary searches and one
+    # subtraction instead of a scan of the fact table.
+    keys = ("Total Incidents", "Total Victims Killed", "Total Victims Injured")
+
+    def __init__(self, dates, values, by_state=None):
+        self.dates = dates
+        self.cumulative = np.vstack([
+            np.zeros((1, len(self.keys)), dtype=np.int64),
+            np.cumsum(values, axis=0, dtype=np.int64)
+        ])
+        self.by_state = by_state or {}
+
+    @classmethod
+    def from_incidents(cls, incidents_data_2):
+        columns = ['TotalIncidents_2', 'TotalKilled_2', 'TotalInjured_2']
+        frame = incidents_data_2[['StateName_2', 'IncidentDate_2'] + columns].copy()
+        frame['IncidentDate_2'] = frame['IncidentDate_2'].dt.normalize()
+
+        def build(group, by_state=None):
+            daily = group.groupby('IncidentDate_2')[columns].sum().sort_index()
+            return cls(daily.index.values.astype('datetime64[D]'), daily.to_numpy(dtype=np.int64), by_state)
+
+        by_state = {state: build(group) for state, group in frame.groupby('StateName_2')}
+        return build(frame, by_state)
+
+    @property
+    def nbytes(self):
+        return self.dates.nbytes + self.cumulative.nbytes + sum(index.nbytes for index in self.by_state.values())
+
+    def totals(self, start_date=None, end_date=None, state=None):
+        # Both ends are inclusive, None leaves that end open. Dates can be
+        # anything pandas parses, e.g. the strings from a DatePickerRange.
+        index = self if state is None else self.by_state.get(state)
+        if index is None:
+            return dict.fromkeys(self.keys, 0)
+        lo = 0 if start_date is None else np.searchsorted(index.dates, to_day(start_date), side='left')
+        hi = len(index.dates) if end_date is None else np.searchsorted(index.dates, to_day(end_date), side='right')
+        if hi <= lo:
+            return dict.fromkeys(self.keys, 0)
+        sums = index.cumulative[hi] - index.cumulative[lo]
+        return {key: int(value) for key, value in zip(self.keys, sums)}
+
+
+def to_day(value):
+    return np.datetime64(pd.Timestamp(value).date(), 'D')
+
+########################################
+# DATABASE CONNECTION AND QUERIES
+########################################
+
+def load_dataset(db_path):
+    conn = sqlite3.connect(db_path)
+
+    query_death_ratio = """
+    SELECT 
+        Locations.StateName AS Location,
+        Victims.VictimKilled AS Victims_Killed,
+        Victims.VictimInjured AS Victims_Injured,
+        Incidents.IncidentDate
+    FROM 
+        Incidents
+    NATURAL JOIN 
+        Locations
+    NATURAL JOIN 
+        Victims;
+    """
+    victim_data = pd.read_sql_query(query_death_ratio, conn)
+
+    query_incident_count = """
+    SELECT 
+        Locations.StateName AS State,
+        Incidents.IncidentDate,
+        COUNT(Incidents.IncidentID) AS IncidentCount
+    FROM 
+        Incidents
+    JOIN 
+        Locations
+    ON 
+        Incidents.LocationID = Locations.LocationID
+    GROUP BY 
+        Locations.StateName, Incidents.IncidentDate
+    """
+    incident_data = pd.read_sql_query(query_incident_count, conn)
+
+    conn.close()
+
+    ########################################
+    # DATA PROCESSING (First Snippet)
+    ########################################
+
+    victim_data['IncidentDate'] = pd.to_datetime(victim_data['IncidentDate'])
+    victim_data['IncidentMonth'] = victim_data['IncidentDate'].dt.strftime('%m')
+    victim_data['Total_Victims'] = victim_data['Victims_Killed'] + victim_data['Victims_Injured']
+
+    grouped_victim = victim_data.groupby(['Location', 'IncidentMonth']).agg({
+        'Total_Victims': 'sum',
+        'Victims_Killed': 'sum'
+    }).reset_index()
+
+    grouped_victim['Death_Ratio'] = grouped_victim.apply(
+        lambda row: round((row['Victims_Killed'] / row['Total_Victims']) * 100, 2) if row['Total_Victims'] > 0 else 0,
+        axis=1
+    )
+
+    all_months_victim = grouped_victim.groupby('Location').agg({
+        'Total_Victims': 'sum',
+        'Victims_Killed': 'sum'
+    }).reset_index()
+    all_months_victim['Death_Ratio'] = all_months_victim.apply(
+        lambda row: round((row['Victims_Killed'] / row['Total_Victims']) * 100, 2) if row['Total_Victims'] > 0 else 0,
+        axis=1
+    )
+    all_months_victim['IncidentMonth'] = 'All'
+
+    complete_victim_data = pd.concat([grouped_victim, all_months_victim], ignore_index=True)
+
+    incident_data['IncidentDate'] = pd.to_datetime(incident_data['IncidentDate'])
+    incident_data['IncidentMonth'] = incident_data['IncidentDate'].dt.strftime('%m')
+    incident_grouped = incident_data.groupby(['State', 'IncidentMonth'], as_index=False)['IncidentCount'].sum()
+
+    all_months_incident = incident_data.groupby('State', as_index=False)['IncidentCount'].sum()
+    all_months_incident['IncidentMonth'] = 'All'
+    complete_incident_data = pd.concat([incident_grouped, all_months_incident], ignore_index=True)
+
+    complete_victim_data['Abbreviation'] = complete_victim_data['Location'].map(state_full_name_map)
+    complete_incident_data['Abbreviation'] = complete_incident_data['State'].map(state_full_name_map)
+
+    merged_data = pd.merge(
+        complete_victim_data[['Abbreviation', 'IncidentMonth', 'Death_Ratio']],
+        complete_incident_data[['Abbreviation', 'IncidentMonth', 'IncidentCount']],
+        on=['Abbreviation', 'IncidentMonth'],
+        how='outer'
+    )
+
+    merged_data = merged_data.dropna(subset=['IncidentCount', 'Death_Ratio'], how='all')
+    state_names = pd.DataFrame(list(state_full_name_map.items()), columns=['FullName', 'Abbreviation'])
+    combined_data = pd.merge(merged_data, state_names, on='Abbreviation', how='left')
+
+    ########################################
+    # SECOND CODE SNIPPET DATA FETCH & PROCESSING
+    ########################################
+
+    conn2 = sqlite3.connect(db_path)
+    query_map = """
+    SELECT 
+        Locations.StateName AS StateName_2,
+        Locations.City_CountyName AS City_CountyName_2,
+        Locations.Latitude AS Latitude_2,
+        Locations.Longitude AS Longitude_2,
+        GROUP_CONCAT(DISTINCT Incidents.IncidentID) AS IncidentIDs_2,
+        COUNT(Incidents.IncidentID) AS TotalIncidents_2,
+        SUM(Victims.VictimKilled) AS TotalKilled_2,
+        SUM(Victims.VictimInjured) AS TotalInjured_2,
+        Incidents.IncidentDate AS IncidentDate_2
+    FROM 
+        Incidents
+    JOIN 
+        Locations
+    ON 
+        Incidents.LocationID = Locations.LocationID
+    JOIN 
+        Victims
+    ON 
+        Incidents.VictimID = Victims.VictimID
+    GROUP BY 
+        Locations.Latitude, Locations.Longitude, Locations.StateName, Locations.City_CountyName, Incidents.IncidentDate
+    """
+    incidents_data_2 = pd.read_sql_query(query_map, conn2)
+
+    query2_2 = """
+    SELECT 
+        IncidentDate AS Date_2,
+        VictimKilled AS Victims_Killed_2,
+        VictimInjured AS Victims_Injured_2
+    FROM Incidents NATURAL JOIN Victims;
+    """
+    data_2 = pd.read_sql_query(query2_2, conn2)
+
+    incidents_query_2 = "SELECT IncidentDate AS IncidentDate_3 FROM incidents"
+    df_incidents_2 = pd.read_sql_query(incidents_query_2, conn2)
+
+    death_ratio_query_2 = """
+    SELECT 
+        Victims.VictimKilled AS Victims_Killed_3,
+        Victims.VictimInjured AS Victims_Injured_3,
+        Incidents.IncidentDate AS IncidentDate_4
+    FROM 
+        Incidents
+    NATURAL JOIN 
+        Victims
+    """
+    df_victims_2 = pd.read_sql_query(death_ratio_query_2, conn2)
+    conn2.close()
+
+    incidents_data_2['TotalVictims_2'] = incidents_data_2['TotalKilled_2'] + incidents_data_2['TotalInjured_2']
+    incidents_data_2['IncidentDate_2'] = pd.to_datetime(incidents_data_2['IncidentDate_2'])
+    # Kept sorted by date so a date range is a contiguous slice found by
+    # binary search (see DateRangeIndex and update_markers_2).
+    incidents_data_2 = incidents_data_2.sort_values('IncidentDate_2', kind='stable').reset_index(drop=True)
+    date_index_2 = DateRangeIndex.from_incidents(incidents_data_2)
+    min_date_2 = incidents_data_2['IncidentDate_2'].min()
+    max_date_2 = incidents_data_2['IncidentDate_2'].max()
+
+    data_2['Date_2'] = pd.to_datetime(data_2['Date_2'], format='%B %d, %Y', errors='coerce')
+    data_2 = data_2.dropna(subset=['Date_2'])
+    data_2['Incident_Count_2'] = 1
+    data_2['Month_2'] = data_2['Date_2'].dt.month
+
+    monthly_data_2 = data_2.groupby('Month_2').agg({
+        'Incident_Count_2': 'sum',
+        'Victims_Killed_2': 'sum',
+        'Victims_Injured_2': 'sum'
+    }).reset_index()
+
+    monthly_data_2['Victim_Killed_Ratio_2'] = monthly_data_2.apply(
+        lambda row: round((row['Victims_Killed_2'] / (row['Victims_Killed_2'] + row['Victims_Injured_2'])) * 100, 2) 
+        if (row['Victims_Killed_2'] + row['Victims_Injured_2']) > 0 else 0,
+        axis=1
+    )
+
+    df_incidents_2['IncidentDate_3'] = pd.to_datetime(df_incidents_2['IncidentDate_3'])
+    df_victims_2['IncidentDate_4'] = pd.to_datetime(df_victims_2['IncidentDate_4'])
+
+    daily_incident_data_2 = df_incidents_2.groupby(df_incidents_2['IncidentDate_3'].dt.day_name()).size().reset_index()
+    daily_incident_data_2.columns = ['day_2', 'incidents_2']
+
+    daily_incident_data_2['day_2'] = pd.Categorical(daily_incident_data_2['day_2'], categories=day_order_2, ordered=True)
+    daily_incident_data_2 = daily_incident_data_2.sort_values('day_2')
+
+    df_victims_2['Total_Victims_3'] = df_victims_2['Victims_Killed_3'] + df_victims_2['Victims_Injured_3']
+    df_victims_2['day_2'] = df_victims_2['IncidentDate_4'].dt.day_name()
+    daily_victim_data_2 = df_victims_2.groupby('day_2').agg({'Victims_Killed_3': 'sum', 'Total_Victims_3': 'sum'}).reset_index()
+    daily_victim_data_2['Death_Ratio_2'] = daily_victim_data_2.apply(
+        lambda row: round((row['Victims_Killed_3'] / row['Total_Victims_3']) * 100, 2) 
+        if row['Total_Victims_3'] > 0 else 0,
+        axis=1
+    )
+    daily_victim_data_2['day_2'] = pd.Categorical(daily_victim_data_2['day_2'], categories=day_order_2, ordered=True)
+    daily_victim_data_2 = daily_victim_data_2.sort_values('day_2')
+
+    combined_daily_data_2 = pd.merge(daily_incident_data_2, daily_victim_data_2, on='day_2', how='outer')
+
+    return {
+        'combined_data': combined_data,
+        'complete_incident_data': complete_incident_data,
+        'complete_victim_data': complete_victim_data,
+        'incidents_data_2': incidents_data_2,
+        'date_index_2': date_index_2,
+        'min_date_2': min_date_2,
+        'max_date_2': max_date_2,
+        'monthly_data_2': monthly_data_2,
+        'combined_daily_data_2': combined_daily_data_2,
+    }
+
+
+def dataset_memory_usage(dataset):
+    size = 0
+    for value in dataset.values():
+        if isinstance(value, pd.DataFrame):
+            size += int(value.memory_usage(index=True, deep=True).sum())
+        elif isinstance(value, DateRangeIndex):
+            size += value.nbytes
+    return size
+
+########################################
+# DATASET REGISTRY (LAZY LOADING + LRU EVICTION)
+########################################
+
+class DatasetRegistry:
+    def __init__(self, datasets, memory_budget_bytes):
+        self.paths = OrderedDict(datasets)
+        self.memory_budget_bytes = memory_budget_bytes
+        self._loaded = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self._load_locks = {key: threading.Lock() for key in self.paths}
+
+    @classmethod
+    def from_env(cls):
+        datasets = parse_dataset_config(os.environ.get('DASHBOARD_DATASETS', DEFAULT_DATASETS))
+        budget_mb = float(os.environ.get('DASHBOARD_MEMORY_BUDGET_MB', DEFAULT_MEMORY_BUDGET_MB))
+        return cls(datasets, int(budget_mb * 1024 * 1024))
+
+    @property
+    def default_key(self):
+        return next(iter(self.paths))
+
+    def keys(self):
+        return list(self.paths)
+
+    def resolve(self, key):
+        return key if key in self.paths else self.default_key
+
+    def title(self, key):
+        return f"U.S. Gun Violence {self.resolve(key)} Dashboard"
+
+    def version(self, key):
+        stat = os.stat(self.paths[self.resolve(key)])
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def get(self, key):
+        key = self.resolve(key)
+        with self._lock:
+            if key in self._loaded:
+                self._loaded.move_to_end(key)
+                return self._loaded[key]
+
+        # Load outside the registry lock so one slow dataset does not block
+        # requests for datasets that are already in memory.
+        with self._load_locks[key]:
+            with self._lock:
+                if key in self._loaded:
+                    self._loaded.move_to_end(key)
+                    return self._loaded[key]
+            dataset = load_dataset(self.paths[key])
+            size = dataset_memory_usage(dataset)
+            with self._lock:
+                self._loaded[key] = dataset
+                self._sizes[key] = size
+                self._evict()
+            return dataset
+
+    def _evict(self):
+        # The dataset that was just requested is the most recently used one
+        # and always stays loaded, even if it alone exceeds the budget.
+        while sum(self._sizes.values()) > self.memory_budget_bytes and len(self._loaded) > 1:
+            oldest = next(iter(self._loaded))
+            del self._loaded[oldest]
+            del self._sizes[oldest]
@@ -0,0 +1,179 @@
+import argparse
+import html
+import json
+import os
+
+from plotly.offline import get_plotlyjs_version
+
+import app
+
+########################################
+# STATIC SNAPSHOT EXPORT
+########################################
+
+# Pre-renders every figure the dashboard can show from its dropdowns, plus the
+# KPI totals, as static JSON next to a small HTML page that switches between
+# them in the browser. The result can be served from any static host or CDN;
+# the live app is only needed for custom date ranges on the cluster map.
+#
+#     python export_static.py --output build/static --live-url https://dashboard.example.org/
+
+# (figure element id, callback, {argument name: dropdown options})
+FIGURES = [
+    ('choropleth-map', app.update_map, {'metric': app.map_metric_options, 'month': app.month_options}),
+    ('top-locations-bar-chart', app.update_chart, {'metric': app.bar_metric_options, 'month': app.month_options}),
+    ('monthly-trends-line-chart_2', app.update_monthly_chart_2, {'metric': app.monthly_metric_options_2}),
+    ('bar-chart_2', app.update_day_of_week_chart_2, {'metric': app.day_of_week_metric_options_2}),
+]
+
+
+def figure_path(figure_id, values):
+    return f"figures/{figure_id}/{'-'.join(values)}.json"
+
+
+def variants(options):
+    # Every combination of dropdown values, in argument order.
+    combinations = [[]]
+    for choices in options.values():
+        combinations = [values + [choice['value']] for values in combinations for choice in choices]
+    return combinations
+
+
+def export_dataset(dataset_key, output_dir, live_url):
+    dataset_dir = os.path.join(output_dir, dataset_key)
+    # Same source as the live KPI cards over the full date range.
+    kpis = app.registry.get(dataset_key)['date_index_2'].totals()
+    written = 0
+
+    for figure_id, callback, options in FIGURES:
+        os.makedirs(os.path.join(dataset_dir, 'figures', figure_id), exist_ok=True)
+        for values in variants(options):
+            # Bypass the result cache: the export always renders fresh
+            # figures and does not count against the live hit ratios.
+            fig = callback.__wrapped__(*values, dataset_key)
+            with open(os.path.join(dataset_dir, figure_path(figure_id, values)), 'w') as f:
+                f.write(fig.to_json())
+            written += 1
+
+    with open(os.path.join(dataset_dir, 'kpis.json'), 'w') as f:
+        json.dump(kpis, f)
+
+    with open(os.path.join(dataset_dir, 'index.html'), 'w') as f:
+        f.write(render_page(dataset_key, kpis, live_url))
+    return written
+
+
+def render_page(dataset_key, kpis, live_url):
+    config = {
+        'figures': [
+            {'id': figure_id, 'controls': [f"{figure_id}--{name}" for name in options]}
+            for figure_id, _, options in FIGURES
+        ]
+    }
+    cards = ''.join(
+        f'<div class="card"><h4>{html.escape(label)}</h4><h5>{kpis[key]:,}</h5></div>'
+        for label, key in [
+            ('Total Incidents', 'Total Incidents'),
+            ('Victims Killed', 'Total Victims Killed'),
+            ('Victims Injured', 'Total Victims Injured'),
+        ]
+    )
+    panels = ''.join(
+        '<div class="panel">' + ''.join(
+            f'<select id="{figure_id}--{name}">' + ''.join(
+                f'<option value="{html.escape(choice["value"])}">{html.escape(choice["label"])}</option>'
+                for choice in choices
+            ) + '</select>'
+            for name, choices in options.items()
+        ) + f'<div id="{figure_id}" class="figure"></div></div>'
+        for figure_id, _, options in FIGURES
+    )
+    live_link = ''
+    if live_url:
+        href = html.escape(f"{live_url.rstrip('/')}/?dataset={dataset_key}")
+        live_link = f'<p><a href="{href}">Open the live dashboard for custom date ranges</a></p>'
+
+    return PAGE_TEMPLATE.format(
+        title=html.escape(app.registry.title(dataset_key)),
+        plotly_version=get_plotlyjs_version(),
+        cards=cards,
+        panels=panels,
+        live_link=live_link,
+        config=json.dumps(config)
+    )
+
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="https://cdn.plot.ly/plotly-{plotly_version}.min.js"></script>
+<style>
+body {{ background: #ECF0F1; font-family: sans-serif; margin: 0; }}
+header {{ background: black; color: white; text-align: center; font-size: 24px; font-weight: bold; padding: 12px; }}
+.row {{ display: flex; flex-wrap: wrap; gap: 16px; padding: 16px; }}
+.card, .panel {{ background: white; box-shadow: 0 2px 8px rgba(0,0,0,0.1); flex: 1 1 30%; padding: 12px; }}
+.panel {{ flex: 1 1 45%; }}
+.card {{ text-align: center; }}
+.card h4 {{ color: #2C3E50; }}
+.card h5 {{ color: #E74C3C; font-size: 30px; margin: 0; }}
+.figure {{ height: 450px; }}
+select {{ margin: 0 8px 8px 0; }}
+footer {{ color: #7F8C8D; font-size: 14px; text-align: right; padding: 0 16px 16px; }}
+</style>
+</head>
+<body>
+<header>{title}</header>
+<div class="row">{cards}</div>
+<div class="row">{panels}</div>
+<footer>{live_link}Provided by U.S National Public Safety Institute (NPSI)</footer>
+<script>
+const config = {config};
+for (const figure of config.figures) {{
+    const render = () => {{
+        const values = figure.controls.map(id => document.getElementById(id).value);
+        fetch(`figures/${{figure.id}}/${{values.join('-')}}.json`)
+            .then(response => response.json())
+            .then(fig => Plotly.react(figure.id, fig.data, fig.layout, {{responsive: true}}));
+    }};
+    figure.controls.forEach(id => document.getElementById(id).addEventListener('change', render));
+    render();
+}}
+</script>
+</body>
+</html>
+"""
+
+
+def render_index(dataset_keys):
+    links = ''.join(
+        f'<li><a href="{html.escape(key)}/index.html">{html.escape(app.registry.title(key))}</a></li>'
+        for key in dataset_keys
+    )
+    return f'<!DOCTYPE html>\n<html>\n<head><meta charset="utf-8"><title>U.S. Gun Violence Dashboards</title></head>\n<body><ul>{links}</ul></body>\n</html>\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export every dashboard view as static files.")
+    parser.add_argument('--output', default='static_site', help="output directory (default: static_site)")
+    parser.add_argument('--dataset', action='append', help="dataset key to export, repeatable (default: all)")
+    parser.add_argument('--live-url', help="URL of the live app, linked from the static pages")
+    args = parser.parse_args()
+
+    dataset_keys = args.dataset or app.registry.keys()
+    unknown = [key for key in dataset_keys if key not in app.registry.keys()]
+    if unknown:
+        parser.error(f"unknown dataset(s): {', '.join(unknown)}")
+
+    os.makedirs(args.output, exist_ok=True)
+    for dataset_key in dataset_keys:
+        written = export_dataset(dataset_key, args.output, args.live_url)
+        print(f"{dataset_key}: {written} figures")
+
+    with open(os.path.join(args.output, 'index.html'), 'w') as f:
+        f.write(render_index(dataset_keys))
+
+
+if __name__ == '__main__':
+    main()
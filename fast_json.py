@@ -0,0 +1,57 @@
+import orjson
+import plotly.io.json
+
+########################################
+# FAST JSON ENCODER FOR CALLBACK RESPONSES
+########################################
+
+# Dash serializes every callback response with plotly.io.json.to_json_plotly.
+# Its stdlib engine walks Dash component trees through a Python-level default
+# hook, and its orjson engine falls back to an even slower pure Python clean-up
+# pass as soon as it meets a component. dumps() hands the whole tree to orjson
+# in one call instead: numeric numpy arrays are written natively, figures keep
+# the base64 typed arrays plotly already put in them, and anything orjson
+# cannot handle falls back to plotly's own encoder.
+
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+_plotly_to_json = plotly.io.json.to_json_plotly
+
+
+def _default(value):
+    if hasattr(value, 'to_plotly_json'):
+        return value.to_plotly_json()
+    if hasattr(value, 'tolist'):
+        # numpy arrays orjson does not write natively (object, datetime, ...)
+        return value.tolist()
+    raise TypeError
+
+
+def dumps(value):
+    try:
+        encoded = orjson.dumps(value, default=_default, option=OPTIONS)
+    except TypeError:
+        return _plotly_to_json(value, engine='json')
+    # The same escapes as plotly's orjson engine, so the output is safe to
+    # inline in HTML. Like that engine (and unlike plotly's json engine, which
+    # escapes all non-ASCII), other non-ASCII characters are sent as UTF-8.
+    return (
+        encoded.replace(b'/', b'\\u002f')
+        .replace(b'<', b'\\u003c')
+        .replace(b'>', b'\\u003e')
+        .replace('\u2028'.encode('utf-8'), b'\\u2028')
+        .replace('\u2029'.encode('utf-8'), b'\\u2029')
+        .decode('utf-8')
+    )
+
+
+def to_json_plotly(plotly_object, pretty=False, engine=None):
+    if pretty or engine is not None:
+        return _plotly_to_json(plotly_object, pretty=pretty, engine=engine)
+    return dumps(plotly_object)
+
+
+def install():
+    # dash._utils.to_json imports to_json_plotly from plotly.io.json on every
+    # call, so replacing it there switches all Dash responses to dumps().
+    plotly.io.json.to_json_plotly = to_json_plotly
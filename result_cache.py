@@ -0,0 +1,330 @@
+import atexit
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import orjson
+
+import fast_json
+
+########################################
+# CACHE CONFIGURATION
+########################################
+
+# DASHBOARD_CACHE_BACKEND selects where callback results are stored. The
+# default "sqlite" backend is a single file on local disk that every gunicorn
+# worker on the host shares, so a figure computed by one worker is a hit for
+# all the others. "none" disables caching.
+DEFAULT_CACHE_BACKEND = "sqlite"
+# Kept next to the app in a directory only the app's user can open, not in
+# the shared system temp directory.
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+DEFAULT_CACHE_PATH = os.path.join(DEFAULT_CACHE_DIR, "results.sqlite")
+DEFAULT_CACHE_TTL_SECONDS = 3600
+DEFAULT_CACHE_MAX_MB = 256
+
+# A hit only rewrites accessed_at (the LRU order) when the stored value is
+# older than this, and hit/miss counts are written at most this often per
+# process, so cache hits from many workers do not queue on SQLite's writer
+# lock.
+ACCESS_REFRESH_SECONDS = 60
+STATS_FLUSH_SECONDS = 10
+
+
+def private_directory(path):
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
+
+########################################
+# CACHE BACKENDS
+########################################
+
+class CacheBackend:
+    # Interface for result cache storage. A networked cache (Redis,
+    # memcached, ...) only needs to implement these methods and be
+    # registered in CACHE_BACKENDS. Values are JSON encoded bytes.
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def add_stats(self, counts):
+        # counts maps callback id to (hits, misses) since the last call.
+        raise NotImplementedError
+
+    def stats(self):
+        raise NotImplementedError
+
+
+class NullCacheBackend(CacheBackend):
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def clear(self):
+        pass
+
+    def add_stats(self, counts):
+        with self._lock:
+            for callback_id, (hits, misses) in counts.items():
+                total_hits, total_misses = self._counts.get(callback_id, (0, 0))
+                self._counts[callback_id] = (total_hits + hits, total_misses + misses)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stats (
+                    callback_id TEXT PRIMARY KEY,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+
+    def _connect(self):
+        # sqlite3 connections must not cross threads or survive a fork, so
+        # each (process, thread) pair opens its own.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, accessed_at FROM entries WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        value, accessed_at = row
+        if now - accessed_at > ACCESS_REFRESH_SECONDS:
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return value
+
+    def set(self, key, value, ttl):
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now + ttl, now)
+            )
+            conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+            self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        self._connect().execute("DELETE FROM entries")
+
+    def add_stats(self, counts):
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO stats (callback_id, hits, misses) VALUES (?, ?, ?) "
+                "ON CONFLICT(callback_id) DO UPDATE SET hits = hits + excluded.hits, misses = misses + excluded.misses",
+                [(callback_id, hits, misses) for callback_id, (hits, misses) in counts.items()]
+            )
+
+    def stats(self):
+        rows = self._connect().execute("SELECT callback_id, hits, misses FROM stats").fetchall()
+        return {callback_id: (hits, misses) for callback_id, hits, misses in rows}
+
+
+def sqlite_backend_from_env():
+    path = os.environ.get('DASHBOARD_CACHE_PATH', DEFAULT_CACHE_PATH)
+    private_directory(os.path.dirname(os.path.abspath(path)))
+    max_bytes = int(float(os.environ.get('DASHBOARD_CACHE_MAX_MB', DEFAULT_CACHE_MAX_MB)) * 1024 * 1024)
+    return SQLiteCacheBackend(path, max_bytes)
+
+
+CACHE_BACKENDS = {
+    'sqlite': sqlite_backend_from_env,
+    'none': NullCacheBackend,
+}
+
+########################################
+# RESULT CACHE
+########################################
+
+class ResultCache:
+    def __init__(self, backend, ttl, namespace=''):
+        self.backend = backend
+        self.ttl = ttl
+        self.namespace = namespace
+        self._pending = {}
+        self._pending_pid = os.getpid()
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+        atexit.register(self.flush_stats)
+
+    @classmethod
+    def from_env(cls, source_modules=()):
+        # The namespace changes whenever DASHBOARD_CACHE_NAMESPACE or the
+        # source of source_modules (e.g. the module building the aggregates)
+        # changes, so a redeploy never serves results of the previous code.
+        name = os.environ.get('DASHBOARD_CACHE_BACKEND', DEFAULT_CACHE_BACKEND)
+        if name not in CACHE_BACKENDS:
+            raise ValueError(f"Unknown cache backend {name!r}, expected one of {sorted(CACHE_BACKENDS)}")
+        ttl = float(os.environ.get('DASHBOARD_CACHE_TTL_SECONDS', DEFAULT_CACHE_TTL_SECONDS))
+        namespace = hashlib.sha256('\n'.join(
+            [os.environ.get('DASHBOARD_CACHE_NAMESPACE', '')]
+            + [inspect.getsource(module) for module in source_modules]
+        ).encode('utf-8')).hexdigest()
+        return cls(CACHE_BACKENDS[name](), ttl, namespace)
+
+    def make_key(self, callback_id, source_hash, args, version):
+        payload = json.dumps(
+            [callback_id, self.namespace, source_hash, version, args],
+            default=str, sort_keys=True
+        )
+        return f"{callback_id}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    def memoize(self, callback_id, version=None, progress=False):
+        # version(*args) identifies the data the result was built from, so
+        # a rebuilt database never serves stale entries. With progress=True
+        # the first argument is the set_progress function Dash passes to
+        # background callbacks and is left out of the key.
+        #
+        # Results are stored as the JSON Dash sends to the browser, so a hit
+        # returns plain dicts and lists (which Dash accepts for figures and
+        # components alike) and nothing from the cache is ever unpickled.
+        def decorator(func):
+            source_hash = hashlib.sha256(inspect.getsource(func).encode('utf-8')).hexdigest()
+
+            def key_for(key_args):
+                return self.make_key(callback_id, source_hash, key_args, version(*key_args) if version else None)
+
+            @functools.wraps(func)
+            def wrapper(*args):
+                key_args = args[1:] if progress else args
+                key = key_for(key_args)
+                cached = self._get(key)
+                if cached is not None:
+                    self._record(callback_id, True)
+                    return cached
+
+                self._record(callback_id, False)
+                result = func(*args)
+                self._set(key, result)
+                return result
+
+            # lookup() and compute() split the wrapper in two for background
+            # callbacks: the request thread looks the result up (and counts
+            # the hit or miss) and only a miss starts a job that computes and
+            # stores it. lookup() takes the arguments without set_progress.
+            def lookup(*key_args):
+                cached = self._get(key_for(key_args))
+                self._record(callback_id, cached is not None)
+                return cached
+
+            def compute(*args):
+                result = func(*args)
+                self._set(key_for(args[1:] if progress else args), result)
+                return result
+
+            wrapper.lookup = lookup
+            wrapper.compute = compute
+            return wrapper
+        return decorator
+
+    def _get(self, key):
+        # Anything that cannot be read back (locked database, corrupt or
+        # foreign entry) is a miss.
+        try:
+            cached = self.backend.get(key)
+            return None if cached is None else orjson.loads(cached)
+        except (sqlite3.Error, ValueError):
+            return None
+
+    def _set(self, key, result):
+        try:
+            self.backend.set(key, fast_json.dumps(result).encode('utf-8'), self.ttl)
+        except sqlite3.Error:
+            pass
+
+    def _record(self, callback_id, hit):
+        with self._lock:
+            if self._pending_pid != os.getpid():
+                # Counts inherited through a fork belong to the parent.
+                self._pending = {}
+                self._pending_pid = os.getpid()
+            hits, misses = self._pending.get(callback_id, (0, 0))
+            self._pending[callback_id] = (hits + 1, misses) if hit else (hits, misses + 1)
+            if time.monotonic() - self._flushed_at < STATS_FLUSH_SECONDS:
+                return
+        self.flush_stats()
+
+    def flush_stats(self):
+        with self._lock:
+            counts, self._pending = self._pending, {}
+            self._flushed_at = time.monotonic()
+        if not counts:
+            return
+        try:
+            self.backend.add_stats(counts)
+        except sqlite3.Error:
+            pass
+
+    def stats(self):
+        # Includes this process's unflushed counts; other workers' counts
+        # can lag by up to STATS_FLUSH_SECONDS.
+        self.flush_stats()
+        report = {}
+        for callback_id, (hits, misses) in sorted(self.backend.stats().items()):
+            total = hits + misses
+            report[callback_id] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': round(hits / total, 4) if total else 0
+            }
+        return report